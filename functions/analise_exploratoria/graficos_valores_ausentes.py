@@ -1,10 +1,30 @@
 # Análise e Tratamento de Valores Ausentes
 
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import chain
+
+import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 import seaborn as sns
 
-def plot_top_names(data, column, top_n=20):
+def _frequencias_para_grafico(data, column, top_n, modo):
+    """
+    Retorna as frequências a serem exibidas nos gráficos de top valores e o erro
+    máximo de cada uma. No modo aproximado, usa o limite inferior garantido
+    (contagem - erro) em vez da estimativa, que é só um limite superior.
+    """
+
+    top = top_k_frequentes(data, column, k=top_n, modo=modo)
+    frequencias = (top['contagem'] - top['erro']).sort_values(ascending=False, kind='stable')
+
+    return frequencias, top['erro'].reindex(frequencias.index)
+
+
+def plot_top_names(data, column, top_n=20, modo='exato'):
     """
     Gera um gráfico de barras com os nomes mais frequentes.
 
@@ -12,11 +32,13 @@ def plot_top_names(data, column, top_n=20):
     - data: DataFrame contendo os dados.
     - column: Nome da coluna para análise de frequência.
     - top_n: Número de valores mais frequentes a serem exibidos.
+    - modo: 'exato' ou 'aproximado' (ver top_k_frequentes). No modo aproximado as
+      barras mostram o limite inferior garantido da frequência e as linhas de erro
+      vão até o limite superior estimado.
     """
 
     # conta as frequências dos valores na coluna
-    name_counts = data[column].value_counts()
-    top_names = name_counts.head(top_n)
+    top_names, erros = _frequencias_para_grafico(data, column, top_n, modo)
     
     # gráfico
     plt.figure(figsize=(10, 6))
@@ -27,6 +49,17 @@ def plot_top_names(data, column, top_n=20):
         legend=False,
         palette=sns.light_palette("#1C356A", reverse=True, n_colors=len(top_names))
     )
+
+    # no modo aproximado, a barra é o limite inferior e a linha vai até o limite superior
+    if erros.any():
+        plt.errorbar(
+            x=top_names.values,
+            y=range(len(top_names)),
+            xerr=[np.zeros(len(erros)), erros.values],
+            fmt='none',
+            ecolor='gray',
+            capsize=3
+        )
     
     plt.title(f'Frequência dos {top_n} Nomes Mais Comuns', fontsize=16, weight='bold')
     plt.xlabel('Frequência', fontsize=14)
@@ -37,7 +70,7 @@ def plot_top_names(data, column, top_n=20):
     plt.show()
 
 
-def plot_top_host_names(data, column, top_n=20):
+def plot_top_host_names(data, column, top_n=20, modo='exato'):
     """
     Gera um gráfico de barras com os host names mais frequentes.
 
@@ -45,11 +78,13 @@ def plot_top_host_names(data, column, top_n=20):
     - data: DataFrame contendo os dados.
     - column: Nome da coluna para análise de frequência.
     - top_n: Número de valores mais frequentes a serem exibidos.
+    - modo: 'exato' ou 'aproximado' (ver top_k_frequentes). No modo aproximado as
+      barras mostram o limite inferior garantido da frequência e as linhas de erro
+      vão até o limite superior estimado.
     """
     
     # conta as frequências dos valores na coluna
-    host_name_counts = data[column].value_counts()
-    top_host_names = host_name_counts.head(top_n)
+    top_host_names, erros = _frequencias_para_grafico(data, column, top_n, modo)
     
     plt.figure(figsize=(10, 6))
     sns.barplot(
@@ -59,6 +94,17 @@ def plot_top_host_names(data, column, top_n=20):
         legend=False,
         palette=sns.light_palette("#1C356A", reverse=True, n_colors=len(top_host_names))
     )
+
+    # no modo aproximado, a barra é o limite inferior e a linha vai até o limite superior
+    if erros.any():
+        plt.errorbar(
+            x=top_host_names.values,
+            y=range(len(top_host_names)),
+            xerr=[np.zeros(len(erros)), erros.values],
+            fmt='none',
+            ecolor='gray',
+            capsize=3
+        )
     
     plt.title(f'Frequência dos {top_n} Host Names Mais Comuns', fontsize=16, weight='bold')
     plt.xlabel('Frequência', fontsize=14)
@@ -138,4 +184,323 @@ def plot_reviews_distribuicao(data, column, bins=30):
 
 
     plt.tight_layout()
-    plt.show()
\ No newline at end of file
+    plt.show()
+
+
+def _iterar_chunks(fonte, chunksize, colunas=None):
+    """
+    Percorre a fonte de dados em blocos de linhas, sem carregar tudo na memória.
+
+    Parâmetros:
+    - fonte: DataFrame ou caminho para um arquivo CSV.
+    - chunksize: Número de linhas por bloco.
+    - colunas: Lista de colunas a serem lidas (None para todas).
+    """
+
+    if isinstance(fonte, pd.DataFrame):
+        if colunas is not None:
+            fonte = fonte[colunas]
+        for inicio in range(0, len(fonte), chunksize):
+            yield fonte.iloc[inicio:inicio + chunksize]
+    else:
+        # leitura em blocos para arquivos maiores que a memória
+        yield from pd.read_csv(fonte, chunksize=chunksize, usecols=colunas)
+
+
+def _mapear_em_paralelo(funcao, chunks, n_jobs):
+    """
+    Aplica uma função a cada bloco em paralelo, mantendo no máximo 2 * n_jobs
+    blocos em processamento ao mesmo tempo para limitar o uso de memória.
+
+    Parâmetros:
+    - funcao: Função aplicada a cada bloco.
+    - chunks: Iterável de blocos (DataFrames).
+    - n_jobs: Número de threads de trabalho.
+    """
+
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        pendentes = deque()
+        for chunk in chunks:
+            pendentes.append(executor.submit(funcao, chunk))
+            if len(pendentes) >= 2 * n_jobs:
+                yield pendentes.popleft().result()
+        while pendentes:
+            yield pendentes.popleft().result()
+
+
+def _perfil_ausentes_chunk(chunk, colunas):
+    """
+    Calcula as estatísticas de valores ausentes de um único bloco.
+
+    Retorna o número de linhas, os nulos por coluna, a matriz de co-ausência
+    e a contagem de cada padrão de ausência (máscara de bits empacotada por linha).
+    """
+
+    mascara = chunk[colunas].isna().to_numpy()
+
+    # nulos por coluna e matriz de co-ausência (produto da máscara por ela mesma)
+    nulos = mascara.sum(axis=0, dtype=np.int64)
+    mascara_float = mascara.astype(np.float64)
+    co_ausencia = (mascara_float.T @ mascara_float).astype(np.int64)
+
+    # cada linha vira uma máscara de bits, contada uma única vez por padrão
+    bits = np.packbits(mascara, axis=1, bitorder='little')
+    unicos, contagens = np.unique(bits, axis=0, return_counts=True)
+    padroes = Counter({padrao.tobytes(): int(n) for padrao, n in zip(unicos, contagens)})
+
+    return len(chunk), nulos, co_ausencia, padroes
+
+
+def perfil_valores_ausentes(fonte, chunksize=100_000, n_jobs=4, top_n=10):
+    """
+    Gera o perfil de valores ausentes em uma única passagem pelos dados, processando
+    os blocos em paralelo. Funciona com DataFrames ou arquivos CSV maiores que a memória.
+
+    Parâmetros:
+    - fonte: DataFrame ou caminho para um arquivo CSV.
+    - chunksize: Número de linhas lidas por bloco.
+    - n_jobs: Número de threads usadas no processamento dos blocos.
+    - top_n: Número de combinações de ausência mais frequentes a serem retornadas.
+
+    Retorna:
+    - DataFrame com a contagem e o percentual de nulos por coluna
+    - DataFrame com a matriz de co-ausência (linhas com as duas colunas nulas)
+    - DataFrame com as combinações de colunas ausentes mais frequentes
+    """
+
+    chunks = _iterar_chunks(fonte, chunksize)
+    primeiro = next(chunks, None)
+    if primeiro is None:
+        raise ValueError("A fonte de dados não possui linhas.")
+
+    colunas = list(primeiro.columns)
+    total_linhas = 0
+    nulos = np.zeros(len(colunas), dtype=np.int64)
+    co_ausencia = np.zeros((len(colunas), len(colunas)), dtype=np.int64)
+    padroes = Counter()
+
+    # junta os resultados parciais de cada bloco
+    todos_chunks = chain([primeiro], chunks)
+    funcao = partial(_perfil_ausentes_chunk, colunas=colunas)
+    for n_linhas, nulos_chunk, co_chunk, padroes_chunk in _mapear_em_paralelo(funcao, todos_chunks, n_jobs):
+        total_linhas += n_linhas
+        nulos += nulos_chunk
+        co_ausencia += co_chunk
+        padroes.update(padroes_chunk)
+
+    resumo = pd.DataFrame(
+        {'nulos': nulos, 'percentual': nulos / total_linhas * 100},
+        index=pd.Index(colunas, name='coluna')
+    )
+    co_ausencia = pd.DataFrame(co_ausencia, index=colunas, columns=colunas)
+
+    # decodifica as máscaras de bits nas combinações de colunas ausentes
+    linhas_padroes = []
+    for padrao, contagem in padroes.most_common(top_n):
+        bits = np.unpackbits(np.frombuffer(padrao, dtype=np.uint8), bitorder='little')[:len(colunas)]
+        ausentes = [coluna for coluna, bit in zip(colunas, bits) if bit]
+        linhas_padroes.append({
+            'colunas_ausentes': ', '.join(ausentes) if ausentes else '(nenhuma)',
+            'n_colunas': len(ausentes),
+            'contagem': contagem,
+            'percentual': contagem / total_linhas * 100
+        })
+    padroes_frequentes = pd.DataFrame(
+        linhas_padroes, columns=['colunas_ausentes', 'n_colunas', 'contagem', 'percentual']
+    )
+
+    return resumo, co_ausencia, padroes_frequentes
+
+
+def plot_co_ausencia(co_ausencia, normalizar=True, apenas_com_ausentes=True):
+    """
+    Gera um heatmap da matriz de co-ausência entre colunas.
+
+    Parâmetros:
+    - co_ausencia: DataFrame retornado por perfil_valores_ausentes.
+    - normalizar: Se True, exibe a proporção de linhas em que a coluna do eixo X
+      também está ausente quando a coluna do eixo Y está ausente.
+    - apenas_com_ausentes: Se True, remove as colunas sem nenhum valor ausente.
+    """
+
+    matriz = co_ausencia
+    if apenas_com_ausentes:
+        com_ausentes = np.diag(matriz.to_numpy()) > 0
+        matriz = matriz.loc[com_ausentes, com_ausentes]
+
+    if matriz.empty:
+        print("Nenhuma coluna com valores ausentes para exibir.")
+        return
+
+    if normalizar:
+        # divide cada linha pelo total de nulos da própria coluna (diagonal)
+        matriz = matriz.div(np.diag(matriz.to_numpy()), axis=0).fillna(0)
+
+    plt.figure(figsize=(10, 8))
+    sns.heatmap(
+        matriz,
+        annot=True,
+        fmt='.2f' if normalizar else 'd',
+        cmap=sns.light_palette("#1C356A", as_cmap=True),
+        linewidths=0.5,
+        square=True
+    )
+
+    plt.title('Co-ausência de Valores entre Colunas', fontsize=16, weight='bold')
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+    plt.show()
+
+
+class ResumoTopK:
+    """
+    Resumo de frequências com memória limitada (Space-Saving ponderado) para
+    encontrar os valores mais frequentes de uma coluna em uma única passagem.
+
+    Garantias, para qualquer valor acompanhado pelo resumo:
+    - contagem é um limite superior da frequência real
+    - contagem - erro é um limite inferior da frequência real
+    Qualquer valor fora do resumo tem frequência real de no máximo `limiar`,
+    então todo valor com frequência maior que `limiar` está no resumo.
+
+    Resumos de blocos diferentes (ou de workers diferentes) podem ser combinados
+    com `mesclar`, mantendo as mesmas garantias.
+    """
+
+    def __init__(self, capacidade=1000):
+        self.capacidade = capacidade
+        self.contagens = pd.Series(dtype=np.int64)
+        self.erros = pd.Series(dtype=np.int64)
+        self.limiar = 0
+        self.total = 0
+
+    @classmethod
+    def de_serie(cls, serie, capacidade=1000):
+        """
+        Cria um resumo a partir de um bloco de valores, mantendo apenas os
+        `capacidade` valores mais frequentes do bloco.
+        """
+
+        resumo = cls(capacidade)
+
+        # contagem exata dentro do bloco, já ordenada de forma decrescente
+        contagens = serie.value_counts()
+        resumo.total = int(contagens.sum())
+        resumo.contagens = contagens.iloc[:capacidade].astype(np.int64)
+        resumo.erros = pd.Series(0, index=resumo.contagens.index, dtype=np.int64)
+
+        # o maior valor descartado limita a frequência de tudo que ficou de fora
+        if len(contagens) > capacidade:
+            resumo.limiar = int(contagens.iloc[capacidade])
+
+        return resumo
+
+    def mesclar(self, outro):
+        """
+        Combina outro resumo neste, mantendo no máximo `capacidade` valores.
+        """
+
+        indice = self.contagens.index.union(outro.contagens.index)
+
+        # valores ausentes de um dos lados recebem o limiar daquele lado
+        contagens = (self.contagens.reindex(indice, fill_value=self.limiar)
+                     + outro.contagens.reindex(indice, fill_value=outro.limiar))
+        erros = (self.erros.reindex(indice, fill_value=self.limiar)
+                 + outro.erros.reindex(indice, fill_value=outro.limiar))
+        limiar = self.limiar + outro.limiar
+
+        # descarta os menos frequentes quando passa da capacidade
+        contagens = contagens.sort_values(ascending=False, kind='stable')
+        if len(contagens) > self.capacidade:
+            limiar = max(limiar, int(contagens.iloc[self.capacidade]))
+            contagens = contagens.iloc[:self.capacidade]
+
+        self.contagens = contagens
+        self.erros = erros.reindex(contagens.index)
+        self.limiar = limiar
+        self.total += outro.total
+
+        return self
+
+    def top(self, k):
+        """
+        Retorna um DataFrame com os k valores mais frequentes, suas contagens
+        estimadas e o erro máximo de cada estimativa.
+        """
+
+        top = pd.DataFrame({
+            'contagem': self.contagens.iloc[:k],
+            'erro': self.erros.reindex(self.contagens.index[:k])
+        })
+        top.index.name = 'valor'
+
+        return top
+
+
+def _contagem_exata_chunk(chunk, coluna):
+    """
+    Conta exatamente os valores de um bloco, na ordem de primeira ocorrência.
+    """
+
+    return chunk[coluna].value_counts(sort=False)
+
+
+def _resumo_top_k_chunk(chunk, coluna, capacidade):
+    """
+    Cria o ResumoTopK de um único bloco.
+    """
+
+    return ResumoTopK.de_serie(chunk[coluna], capacidade)
+
+
+def top_k_frequentes(fonte, coluna, k=20, modo='aproximado', capacidade=None,
+                     chunksize=100_000, n_jobs=4):
+    """
+    Encontra os k valores mais frequentes de uma coluna em uma única passagem
+    pelos dados, processando os blocos em paralelo.
+
+    Parâmetros:
+    - fonte: DataFrame ou caminho para um arquivo CSV.
+    - coluna: Nome da coluna para análise de frequência.
+    - k: Número de valores mais frequentes a serem retornados.
+    - modo: 'aproximado' usa o ResumoTopK com memória limitada; 'exato' usa o
+      value_counts do pandas (em um DataFrame, direto na coluna; em um CSV, por
+      bloco, somando as contagens parciais uma única vez no final). O modo exato
+      guarda todos os valores distintos na memória e serve para validação.
+    - capacidade: Número de valores acompanhados no modo aproximado
+      (padrão: o maior entre 50 * k e 1000).
+    - chunksize: Número de linhas lidas por bloco.
+    - n_jobs: Número de threads usadas no processamento dos blocos.
+
+    Retorna um DataFrame indexado pelos valores, com as colunas 'contagem' e
+    'erro' (sempre 0 no modo exato).
+    """
+
+    if modo == 'exato':
+        if isinstance(fonte, pd.DataFrame):
+            contagens = fonte[coluna].value_counts()
+        else:
+            # junta as contagens parciais e soma uma única vez, mantendo a ordem de ocorrência
+            funcao = partial(_contagem_exata_chunk, coluna=coluna)
+            chunks = _iterar_chunks(fonte, chunksize, colunas=[coluna])
+            parciais = list(_mapear_em_paralelo(funcao, chunks, n_jobs))
+            contagens = pd.concat(parciais).groupby(level=0, sort=False).sum().sort_values(ascending=False)
+
+        top = pd.DataFrame({'contagem': contagens.iloc[:k].astype(np.int64), 'erro': 0})
+        top.index.name = 'valor'
+
+        return top
+
+    if modo != 'aproximado':
+        raise ValueError(f"Modo inválido: {modo!r}. Use 'exato' ou 'aproximado'.")
+
+    if capacidade is None:
+        capacidade = max(50 * k, 1000)
+
+    resumo = ResumoTopK(capacidade)
+    chunks = _iterar_chunks(fonte, chunksize, colunas=[coluna])
+    funcao = partial(_resumo_top_k_chunk, coluna=coluna, capacidade=capacidade)
+    for resumo_chunk in _mapear_em_paralelo(funcao, chunks, n_jobs):
+        resumo.mesclar(resumo_chunk)
+
+    return resumo.top(k)
@@ -1,5 +1,7 @@
 # Verifica se o número mínimo de noites e a disponibilidade ao longo do ano interferem no preço
 
+import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
@@ -43,4 +45,99 @@ def scatter_plot(data):
     plt.ylabel('Preço')
 
     plt.tight_layout()
-    plt.show()
\ No newline at end of file
+    plt.show()
+
+
+def simular_precos(modelo, data, grade, objetivo='max', limite_celulas=2_000_000):
+    """
+    Simula o preço previsto de cada imóvel para todas as combinações de valores
+    candidatos das colunas ajustáveis (ex.: 'minimo_noites' e 'disponibilidade_365')
+    e retorna a melhor configuração por imóvel.
+
+    A grade cartesiana é avaliada em lote, em blocos de imóveis, para manter a
+    memória limitada. Apenas as colunas da grade são substituídas; as demais features
+    já codificadas são reaproveitadas. Para modelos lineares cuja previsão é
+    exatamente `X @ coef_ + intercept_` (verificado nos próprios imóveis), o preço de
+    cada ponto da grade é obtido somando ao preço atual a variação causada pelas
+    colunas alteradas; os demais modelos (ex.: GLMs com link log) chamam predict.
+
+    Parâmetros:
+    modelo: Modelo treinado com método predict (ex.: o LinearRegression salvo em 'model/').
+    data (DataFrame): Imóveis já transformados com as mesmas features usadas no treino.
+    grade (dict): Dicionário {coluna: lista de valores candidatos}.
+    objetivo (str): 'max' para maximizar o preço sugerido ou 'min' para minimizar.
+    limite_celulas (int): Número máximo de valores float64 alocados por bloco: imóveis x
+        pontos da grade no caminho linear e imóveis x pontos da grade x features no
+        caminho genérico. O pico de memória fica em torno de 8 * limite_celulas bytes
+        (16 MB no padrão), exceto quando um único imóvel já ultrapassa o limite.
+
+    Retorno:
+    DataFrame com o mesmo índice de 'data', contendo 'preco_atual', o valor sugerido
+    para cada coluna da grade (sufixo '_sugerido'), 'preco_sugerido' e 'variacao'.
+    """
+
+    if objetivo not in ('max', 'min'):
+        raise ValueError(f"Objetivo inválido: {objetivo!r}. Use 'max' ou 'min'.")
+
+    features = list(getattr(modelo, 'feature_names_in_', data.columns))
+    colunas_grade = list(grade)
+    if not colunas_grade:
+        raise ValueError("A grade precisa ter pelo menos uma coluna.")
+    vazias = [coluna for coluna in colunas_grade if len(grade[coluna]) == 0]
+    if vazias:
+        raise ValueError(f"Colunas da grade sem valores candidatos: {vazias}")
+    faltando = [coluna for coluna in colunas_grade if coluna not in features]
+    if faltando:
+        raise ValueError(f"Colunas da grade não usadas pelo modelo: {faltando}")
+
+    # produto cartesiano dos valores candidatos: uma linha por ponto da grade
+    malha = np.meshgrid(*[np.asarray(grade[coluna], dtype=np.float64) for coluna in colunas_grade], indexing='ij')
+    pontos = np.column_stack([eixo.ravel() for eixo in malha])
+    n_pontos = len(pontos)
+
+    X = data[features].to_numpy(dtype=np.float64)
+    posicoes = [features.index(coluna) for coluna in colunas_grade]
+    preco_atual = np.asarray(modelo.predict(data[features]), dtype=np.float64)
+
+    # o atalho linear só vale se predict for exatamente X @ coef_ + intercept_
+    coef = getattr(modelo, 'coef_', None)
+    intercepto = getattr(modelo, 'intercept_', 0.0)
+    linear = (
+        coef is not None and np.ndim(coef) == 1 and np.ndim(intercepto) == 0
+        and np.allclose(X @ np.asarray(coef, dtype=np.float64) + intercepto, preco_atual)
+    )
+    if linear:
+        # contribuição das colunas ajustáveis em cada ponto da grade
+        coef_grade = np.asarray(coef, dtype=np.float64)[posicoes]
+        contribuicao_grade = pontos @ coef_grade
+
+    melhores = np.empty(len(X), dtype=np.int64)
+    precos_sugeridos = np.empty(len(X), dtype=np.float64)
+    celulas_por_imovel = n_pontos if linear else n_pontos * len(features)
+    tamanho_bloco = max(1, limite_celulas // celulas_por_imovel)
+
+    for inicio in range(0, len(X), tamanho_bloco):
+        bloco = slice(inicio, inicio + tamanho_bloco)
+        X_bloco = X[bloco]
+
+        if linear:
+            # preço atual sem a contribuição atual das colunas da grade
+            base = preco_atual[bloco] - X_bloco[:, posicoes] @ coef_grade
+            precos = base[:, None] + contribuicao_grade[None, :]
+        else:
+            # repete cada imóvel para todos os pontos e troca só as colunas da grade
+            X_grade = np.repeat(X_bloco, n_pontos, axis=0)
+            X_grade[:, posicoes] = np.tile(pontos, (len(X_bloco), 1))
+            precos = modelo.predict(pd.DataFrame(X_grade, columns=features, copy=False)).reshape(len(X_bloco), n_pontos)
+
+        escolhidos = precos.argmax(axis=1) if objetivo == 'max' else precos.argmin(axis=1)
+        melhores[bloco] = escolhidos
+        precos_sugeridos[bloco] = precos[np.arange(len(X_bloco)), escolhidos]
+
+    resultado = pd.DataFrame({'preco_atual': preco_atual}, index=data.index)
+    for i, coluna in enumerate(colunas_grade):
+        resultado[f'{coluna}_sugerido'] = pontos[melhores, i]
+    resultado['preco_sugerido'] = precos_sugeridos
+    resultado['variacao'] = resultado['preco_sugerido'] - resultado['preco_atual']
+
+    return resultado